@@ -2,6 +2,6 @@ import uvicorn
 from .app import create_app
 
 def start_server(host: str = "0.0.0.0", port: int = 8000):
-    """Start the ZerePy server"""
+    """Start the ZerePy server in a single worker process (see ServerState)"""
     app = create_app()
-    uvicorn.run(app, host=host, port=port)
\ No newline at end of file
+    uvicorn.run(app, host=host, port=port, loop="uvloop", http="httptools")
\ No newline at end of file
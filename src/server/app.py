@@ -1,37 +1,242 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks
-import time
-import json
-from pydantic import BaseModel
-from typing import Optional, List, Dict, Any
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.middleware.gzip import GZipMiddleware
+import gzip
+import orjson
+from pydantic import BaseModel, ConfigDict
+from typing import List, Dict, Any, Callable, Optional, Tuple
 import logging
-import asyncio
+import os
+import time
+import anyio.to_thread
 import signal
 import threading
+from contextlib import asynccontextmanager
+from functools import lru_cache
 from pathlib import Path
+from dotenv import load_dotenv
 from src.cli import ZerePyCLI
+from src.server.middleware import PathCORSMiddleware
+from src.server.responses import ORJSONResponse
+from src.server.routing import ORJSONRoute
+
+load_dotenv()
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("server/app")
 
+def _log_level_from_env() -> int:
+    """Level named by LOG_LEVEL (e.g. DEBUG to log full agent message payloads), INFO if unset or unknown"""
+    name = (os.getenv("LOG_LEVEL") or "INFO").strip().upper()
+    level = logging.getLevelNamesMapping().get(name)
+    if level is None:
+        logger.warning("Unknown LOG_LEVEL %r, falling back to INFO", name)
+        return logging.INFO
+    return level
+
+logger.setLevel(_log_level_from_env())
+
+# Comma-separated browser origins allowed to call the frontend routes, none if unset
+ALLOWED_ORIGINS = [origin.strip() for origin in (os.getenv("ALLOWED_ORIGINS") or "").split(",") if origin.strip()]
+# "*" opts in to any origin, but only without credentials: with them Starlette echoes whatever Origin was sent
+ALLOW_CREDENTIALS = "*" not in ALLOWED_ORIGINS
+# Routes the browser frontend calls, the agent control API stays same-origin only
+FRONTEND_PATHS = ("/chat", "/api/message", "/api/health")
+
+# Seconds the agent loop thread sleeps between iterations
+AGENT_LOOP_IDLE_SECONDS = 1.0
+# Threads available for blocking agent actions (anyio's default is 40)
+AGENT_ACTION_THREAD_LIMIT = 200
+
+# Canned responses that never change between requests, serialized once at import
+AGENT_WALLET = "0x742d35Cc6634C0532925a3b844Bc454e4438f44e"
+EVENT_NEXT_STEPS = (
+    "Search for venues near your location",
+    "Promote your event on Twitter and Warpcast",
+    "Transfer budget for event management"
+)
+DEFAULT_PLATFORMS = ("Twitter", "Warpcast")
+JSON_MEDIA_TYPE = "application/json"
+GZIP_MINIMUM_SIZE = 512
+GZIP_COMPRESS_LEVEL = 5
+
+_VENUE_SEARCH_BYTES = orjson.dumps({
+    "content": {
+        "response": "I found several potential venues for your event.",
+        "venues": [
+            {
+                "name": "Blockchain Conference Center",
+                "description": "Perfect venue for tech events with capacity for 500 attendees",
+                "link": "https://example.com/venue1"
+            },
+            {
+                "name": "Crypto Convention Hall",
+                "description": "Modern space with advanced AV equipment and flexible layout",
+                "link": "https://example.com/venue2"
+            },
+            {
+                "name": "Web3 Workshop Space",
+                "description": "Intimate setting ideal for focused workshops and smaller gatherings",
+                "link": "https://example.com/venue3"
+            }
+        ],
+        "emails_sent": True
+    }
+})
+_BUDGET_TRANSFER_BYTES = orjson.dumps({
+    "content": {
+        "response": "Thank you for transferring CORAL for your event budget.",
+        "transaction_hash": "0x1234567890abcdef1234567890abcdef1234567890abcdef1234567890abcdef",
+        "explorer_link": "https://explorer.sonic.zkevm.io/tx/0x1234567890abcdef1234567890abcdef1234567890abcdef1234567890abcdef"
+    }
+})
+_HEALTH_BYTES = orjson.dumps({"status": "healthy", "version": "1.0.0"})
+
+# The only static body over GZIP_MINIMUM_SIZE, compressed once instead of on every request
+_VENUE_SEARCH_GZIP = gzip.compress(_VENUE_SEARCH_BYTES, compresslevel=GZIP_COMPRESS_LEVEL)
+_GZIP_HEADERS = {"Content-Encoding": "gzip", "Vary": "Accept-Encoding"}
+
+def _handle_event_submission(content: Dict[str, Any]) -> bytes:
+    try:
+        event_name = content["event_data"]["eventName"]
+    except (KeyError, TypeError):
+        event_name = "Unnamed Event"
+    logger.info("Processing event submission for: %s", event_name)
+    return orjson.dumps({
+        "content": {
+            "response": f"Thank you for submitting your event: {event_name}! I'll help you organize it.",
+            "event_received": True,
+            "agent_wallet": AGENT_WALLET,
+            "next_steps": EVENT_NEXT_STEPS
+        }
+    })
+
+def _handle_venue_search(content: Dict[str, Any]) -> bytes:
+    return _VENUE_SEARCH_BYTES
+
+def _handle_social_promotion(content: Dict[str, Any]) -> bytes:
+    platforms = content.get("platforms", DEFAULT_PLATFORMS)
+    return orjson.dumps({
+        "content": {
+            "response": f"I've promoted your event on {', '.join(platforms)}!",
+            "post_content": "Exciting new crypto event coming soon! Join us for discussions on blockchain, AI, and the future of tech. #blockchain #crypto #ethereum #ai",
+            "platforms": platforms,
+            "twitter_post_url": "https://twitter.com/Eth202541789/status/1234567890",
+            "warpcast_post_url": "https://warpcast.com/beerslothcoder/0x1234"
+        }
+    })
+
+def _handle_budget_transfer(content: Dict[str, Any]) -> bytes:
+    return _BUDGET_TRANSFER_BYTES
+
+def _handle_custom_message(content: Dict[str, Any]) -> bytes:
+    user_message = content.get("message", "")
+    return orjson.dumps({
+        "content": {
+            "response": f"I received your message: '{user_message}'. How can I help with your event?"
+        }
+    })
+
+def _handle_default(content: Dict[str, Any]) -> bytes:
+    return orjson.dumps({
+        "content": {
+            "response": f"Successfully processed {content.get('type')} request!"
+        }
+    })
+
+# Message type -> handler returning the serialized response body
+_HANDLERS: Dict[str, Callable[[Dict[str, Any]], bytes]] = {
+    "event_submission": _handle_event_submission,
+    "venue_search": _handle_venue_search,
+    "social_promotion": _handle_social_promotion,
+    "budget_transfer": _handle_budget_transfer,
+    "custom_message": _handle_custom_message,
+}
+
+# (epoch second, formatted local time) for the last timestamp handed out
+_ts_cache: Tuple[int, str] = (0, "")
+
+def _now_str() -> str:
+    """Current local time as a string, formatted at most once per second"""
+    global _ts_cache
+    now = int(time.time())
+    if now != _ts_cache[0]:
+        _ts_cache = (now, time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(now)))
+    return _ts_cache[1]
+
+def _print_chat_message(timestamp: str, message: str) -> None:
+    """Echo a frontend chat message to the server console"""
+    print(f"\n[{timestamp}] Received from frontend: {message}")
+    print("-" * 50)
+
+def _log_response_body(body: bytes) -> None:
+    """Log a serialized response body at DEBUG level"""
+    logger.debug("Sending response: %s", body.decode())
+
+# (mtime of the agents directory, agent names found in it)
+_agents_cache: Optional[Tuple[int, List[str]]] = None
+
+def _list_agent_names(agents_dir: Path) -> List[str]:
+    """List agent config names, rescanning only when the directory changes"""
+    global _agents_cache
+    try:
+        mtime = agents_dir.stat().st_mtime_ns
+    except FileNotFoundError:
+        return []
+    if _agents_cache and _agents_cache[0] == mtime:
+        return _agents_cache[1]
+
+    with os.scandir(agents_dir) as entries:
+        agents = [
+            entry.name[:-len(".json")] for entry in entries
+            if entry.name.endswith(".json") and entry.name != "general.json"
+        ]
+    _agents_cache = (mtime, agents)
+    return agents
+
 class ActionRequest(BaseModel):
     """Request model for agent actions"""
+    model_config = ConfigDict(extra='ignore')
     connection: str
     action: str
-    params: Optional[List[str]] = []
+    params: List[str] = []
 
 class ConfigureRequest(BaseModel):
     """Request model for configuring connections"""
+    model_config = ConfigDict(extra='ignore')
     connection: str
-    params: Optional[Dict[str, Any]] = {}
+    params: Dict[str, Any] = {}
+
+class ChatMessage(BaseModel):
+    """Request model for frontend chat messages"""
+    model_config = ConfigDict(extra='ignore')
+    message: str
 
 class EventSubmission(BaseModel):
     """Request model for agent messages"""
+    model_config = ConfigDict(extra='ignore')
     content: Dict[str, Any]
 
+@lru_cache(maxsize=1)
+def get_cli() -> ZerePyCLI:
+    """ZerePyCLI shared by every app built in this process.
+
+    uvicorn's app factory runs once per worker process (and --reload starts
+    a fresh process), so main.py's server mode only calls this once. The
+    cache only matters when code calls create_app() more than once in a
+    process: those apps share one CLI and so one loaded agent. The
+    interactive CLI in main.py builds its own ZerePyCLI instead.
+    """
+    return ZerePyCLI()
+
 class ServerState:
-    """Simple state management for the server"""
+    """Simple state management for the server.
+
+    State is held in process memory, so every uvicorn worker gets its own
+    loaded agent and agent loop. Run this server with a single worker until
+    agent state lives in a shared store.
+    """
     def __init__(self):
-        self.cli = ZerePyCLI()
+        self.cli = get_cli()
         self.agent_running = False
         self.agent_task = None
         self._stop_event = threading.Event()
@@ -48,11 +253,15 @@ class ServerState:
                             log_once = True
 
                     except Exception as e:
-                        logger.error(f"Error in agent action: {e}")
+                        logger.error("Error in agent action: %s", e)
                         if self._stop_event.wait(timeout=30):
                             break
+
+                # Sleep between iterations instead of spinning, waking early on stop
+                if self._stop_event.wait(timeout=AGENT_LOOP_IDLE_SECONDS):
+                    break
         except Exception as e:
-            logger.error(f"Error in agent loop thread: {e}")
+            logger.error("Error in agent loop thread: %s", e)
         finally:
             self.agent_running = False
             logger.info("Agent loop stopped")
@@ -80,10 +289,33 @@ class ServerState:
 
 class ZerePyServer:
     def __init__(self):
-        self.app = FastAPI(title="ZerePy Server")
+        self.app = FastAPI(
+            title="ZerePy Server",
+            default_response_class=ORJSONResponse,
+            lifespan=self.lifespan
+        )
+        # Parse request bodies with orjson for every route registered below
+        self.app.router.route_class = ORJSONRoute
+        # Set ALLOWED_ORIGINS to the frontend's origins when it is served from another origin
+        self.app.add_middleware(
+            PathCORSMiddleware,
+            paths=FRONTEND_PATHS,
+            allow_origins=ALLOWED_ORIGINS,
+            allow_credentials=ALLOW_CREDENTIALS,
+            allow_methods=["*"],
+            allow_headers=["*"],
+        )
+        # Added after CORS so it wraps it and compresses the final response body
+        self.app.add_middleware(GZipMiddleware, minimum_size=GZIP_MINIMUM_SIZE, compresslevel=GZIP_COMPRESS_LEVEL)
         self.state = ServerState()
         self.setup_routes()
 
+    @asynccontextmanager
+    async def lifespan(self, app: FastAPI):
+        """Size the thread pool before serving so agent actions don't queue under load"""
+        anyio.to_thread.current_default_thread_limiter().total_tokens = AGENT_ACTION_THREAD_LIMIT
+        yield
+
     def setup_routes(self):
         @self.app.get("/")
         async def root():
@@ -94,17 +326,12 @@ class ZerePyServer:
                 "agent_running": self.state.agent_running
             }
 
-        @self.app.get("/agents")
-        async def list_agents():
+        @self.app.get("/agents", response_model=None)
+        async def list_agents() -> Response:
             """List available agents"""
+            logger.info("Agent list requested")
             try:
-                agents = []
-                agents_dir = Path("agents")
-                if agents_dir.exists():
-                    for agent_file in agents_dir.glob("*.json"):
-                        if agent_file.stem != "general":
-                            agents.append(agent_file.stem)
-                return {"agents": agents}
+                return ORJSONResponse({"agents": _list_agent_names(Path("agents"))})
             except Exception as e:
                 raise HTTPException(status_code=500, detail=str(e))
 
@@ -137,20 +364,21 @@ class ZerePyServer:
             except Exception as e:
                 raise HTTPException(status_code=500, detail=str(e))
 
-        @self.app.post("/agent/action")
-        async def agent_action(action_request: ActionRequest):
+        @self.app.post("/agent/action", response_model=None)
+        async def agent_action(action_request: ActionRequest) -> Response:
             """Execute a single agent action"""
+            logger.info("Agent Action: %s on %s", action_request.action, action_request.connection)
             if not self.state.cli.agent:
                 raise HTTPException(status_code=400, detail="No agent loaded")
             
             try:
-                result = await asyncio.to_thread(
+                result = await run_in_threadpool(
                     self.state.cli.agent.perform_action,
                     connection=action_request.connection,
                     action=action_request.action,
                     params=action_request.params
                 )
-                return {"status": "success", "result": result}
+                return ORJSONResponse({"status": "success", "result": result})
             except Exception as e:
                 raise HTTPException(status_code=400, detail=str(e))
 
@@ -215,93 +443,57 @@ class ZerePyServer:
             except Exception as e:
                 raise HTTPException(status_code=500, detail=str(e))
 
-        @self.app.post("/api/message")
-        async def api_message(request: EventSubmission):
+        @self.app.post("/chat", response_model=None)
+        async def chat(message: ChatMessage, background: BackgroundTasks) -> Response:
+            """Receive a chat message from the frontend"""
+            timestamp = _now_str()
+            logger.info("Received message at %s: %s", timestamp, message.message)
+            # Console output runs after the response is sent
+            background.add_task(_print_chat_message, timestamp, message.message)
+            return ORJSONResponse({"response": f"Server received: {message.message}"})
+
+        @self.app.post("/api/message", response_model=None)
+        async def api_message(request: EventSubmission, http_request: Request, background: BackgroundTasks) -> Response:
             """Handle agent messages"""
             try:
                 content = request.content
                 message_type = content.get("type")
-                logging.info(f"Received agent message of type: {message_type}")
-                print(f"\n[{time.strftime('%Y-%m-%d %H:%M:%S')}] Received agent message: {json.dumps(content, indent=2)}")
+                logger.info("Received agent message of type: %s", message_type)
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Received agent message: %s", orjson.dumps(content, option=orjson.OPT_INDENT_2).decode())
                 
-                # Base response structure
-                response = {
-                    "response": f"Successfully processed {message_type} request!"
-                }
+                # "type" can be any JSON value, only strings can name a handler
+                handler = _HANDLERS.get(message_type) if isinstance(message_type, str) else None
+                body = (handler or _handle_default)(content)
                 
-                # Handle different message types
-                if message_type == "event_submission":
-                    event_data = content.get("event_data", {})
-                    event_name = event_data.get("eventName", "Unnamed Event")
-                    logging.info(f"Processing event submission for: {event_name}")
-                    
-                    response = {
-                        "response": f"Thank you for submitting your event: {event_name}! I'll help you organize it.",
-                        "event_received": True,
-                        "agent_wallet": "0x742d35Cc6634C0532925a3b844Bc454e4438f44e",
-                        "next_steps": [
-                            "Search for venues near your location",
-                            "Promote your event on Twitter and Warpcast",
-                            "Transfer budget for event management"
-                        ]
-                    }
-                    
-                elif message_type == "venue_search":
-                    response = {
-                        "response": "I found several potential venues for your event.",
-                        "venues": [
-                            {
-                                "name": "Blockchain Conference Center",
-                                "description": "Perfect venue for tech events with capacity for 500 attendees",
-                                "link": "https://example.com/venue1"
-                            },
-                            {
-                                "name": "Crypto Convention Hall",
-                                "description": "Modern space with advanced AV equipment and flexible layout",
-                                "link": "https://example.com/venue2"
-                            },
-                            {
-                                "name": "Web3 Workshop Space",
-                                "description": "Intimate setting ideal for focused workshops and smaller gatherings",
-                                "link": "https://example.com/venue3"
-                            }
-                        ],
-                        "emails_sent": True
-                    }
-                    
-                elif message_type == "social_promotion":
-                    platforms = content.get("platforms", ["Twitter", "Warpcast"])
-                    response = {
-                        "response": f"I've promoted your event on {', '.join(platforms)}!",
-                        "post_content": "Exciting new crypto event coming soon! Join us for discussions on blockchain, AI, and the future of tech. #blockchain #crypto #ethereum #ai",
-                        "platforms": platforms,
-                        "twitter_post_url": "https://twitter.com/Eth202541789/status/1234567890",
-                        "warpcast_post_url": "https://warpcast.com/beerslothcoder/0x1234"
-                    }
-                    
-                elif message_type == "budget_transfer":
-                    response = {
-                        "response": "Thank you for transferring CORAL for your event budget.",
-                        "transaction_hash": "0x1234567890abcdef1234567890abcdef1234567890abcdef1234567890abcdef",
-                        "explorer_link": "https://explorer.sonic.zkevm.io/tx/0x1234567890abcdef1234567890abcdef1234567890abcdef1234567890abcdef"
-                    }
-                    
-                elif message_type == "custom_message":
-                    user_message = content.get("message", "")
-                    response["response"] = f"I received your message: '{user_message}'. How can I help with your event?"
-                
-                print(f"Sending response: {json.dumps(response, indent=2)}")
-                return {"content": response}
+                if logger.isEnabledFor(logging.DEBUG):
+                    background.add_task(_log_response_body, body)
+
+                # GZipMiddleware passes responses that already set Content-Encoding through untouched
+                if body is _VENUE_SEARCH_BYTES and "gzip" in http_request.headers.get("accept-encoding", ""):
+                    return Response(_VENUE_SEARCH_GZIP, media_type=JSON_MEDIA_TYPE, headers=_GZIP_HEADERS)
+                return Response(body, media_type=JSON_MEDIA_TYPE)
                 
             except Exception as e:
-                logging.error(f"Error processing agent message: {str(e)}")
-                return {
+                logger.error("Error processing agent message: %s", e)
+                return ORJSONResponse({
                     "content": {
                         "response": f"Error processing your request: {str(e)}",
                         "error": True
                     }
-                }
+                })
+
+        @self.app.get("/api/health", response_model=None)
+        async def health_check() -> Response:
+            """Health check endpoint"""
+            return Response(_HEALTH_BYTES, media_type=JSON_MEDIA_TYPE)
 
 def create_app():
+    # Replaces the bare '%(message)s' format src.cli sets up for the interactive CLI
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        force=True
+    )
     server = ZerePyServer()
     return server.app
\ No newline at end of file
@@ -0,0 +1,17 @@
+from typing import Any, Collection
+from fastapi.middleware.cors import CORSMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+class PathCORSMiddleware(CORSMiddleware):
+    """CORSMiddleware that only applies to the given paths, every other route stays same-origin"""
+
+    def __init__(self, app: ASGIApp, paths: Collection[str], **kwargs: Any) -> None:
+        super().__init__(app, **kwargs)
+        self.paths = frozenset(paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and scope["path"] not in self.paths:
+            # No CORS headers, so browsers refuse cross-origin calls and preflights
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
@@ -0,0 +1,12 @@
+from typing import Any
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+class ORJSONResponse(JSONResponse):
+    """JSON response serialized with orjson instead of the stdlib json module"""
+
+    def render(self, content: Any) -> bytes:
+        # Types orjson can't handle natively (Decimal balances, bytes, sets, ...)
+        # are converted the same way FastAPI's default response would
+        return orjson.dumps(content, default=jsonable_encoder, option=orjson.OPT_NON_STR_KEYS)
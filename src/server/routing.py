@@ -0,0 +1,36 @@
+import json
+import re
+from typing import Any, Callable, Coroutine
+import orjson
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+# orjson only keeps integers in the 64-bit range exact and silently turns wider
+# ones into floats. Any run of 19+ digits might be such an integer (a wei amount,
+# say), so those bodies go through the stdlib parser instead.
+_WIDE_NUMBER = re.compile(rb"\d{19,}")
+
+class ORJSONRequest(Request):
+    """Request that parses its JSON body with orjson instead of the stdlib json module"""
+
+    async def json(self) -> Any:
+        if not hasattr(self, "_json"):
+            body = await self.body()
+            if _WIDE_NUMBER.search(body):
+                self._json = json.loads(body)
+            else:
+                # orjson.JSONDecodeError subclasses json.JSONDecodeError, so FastAPI
+                # still turns malformed bodies into a 422 response
+                self._json = orjson.loads(body)
+        return self._json
+
+class ORJSONRoute(APIRoute):
+    """Route that hands its endpoint an ORJSONRequest"""
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        original_route_handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            return await original_route_handler(ORJSONRequest(request.scope, request.receive))
+
+        return route_handler
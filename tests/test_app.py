@@ -0,0 +1,62 @@
+import gzip
+import os
+import pytest
+from fastapi.testclient import TestClient
+from src.server import app as server_app
+
+VENUE_SEARCH = {"content": {"type": "venue_search"}}
+
+@pytest.fixture(scope="module")
+def client() -> TestClient:
+    return TestClient(server_app.create_app())
+
+def test_venue_search_is_served_pre_compressed(client):
+    with client.stream("POST", "/api/message", json=VENUE_SEARCH, headers={"Accept-Encoding": "gzip"}) as response:
+        raw = b"".join(response.iter_raw())
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert raw == server_app._VENUE_SEARCH_GZIP
+    assert gzip.decompress(raw) == server_app._VENUE_SEARCH_BYTES
+
+def test_venue_search_without_gzip_is_sent_as_is(client):
+    response = client.post("/api/message", json=VENUE_SEARCH, headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    assert response.content == server_app._VENUE_SEARCH_BYTES
+
+def test_small_bodies_are_not_compressed(client):
+    response = client.post("/api/message", json={"content": {"type": "budget_transfer"}}, headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert response.content == server_app._BUDGET_TRANSFER_BYTES
+
+@pytest.fixture
+def agents_dir(tmp_path, monkeypatch):
+    # The cache is module-global and keyed on mtime only, so start each case empty
+    monkeypatch.setattr(server_app, "_agents_cache", None)
+    for name in ("example.json", "starter.json", "general.json", "notes.txt"):
+        (tmp_path / name).write_text("{}")
+    return tmp_path
+
+def _touch_dir(path):
+    # Some filesystems keep coarse mtimes, so move it forward explicitly
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+def test_agent_names_skip_general_and_non_json(agents_dir):
+    assert sorted(server_app._list_agent_names(agents_dir)) == ["example", "starter"]
+
+def test_agent_names_are_cached_until_the_directory_changes(agents_dir, monkeypatch):
+    first = server_app._list_agent_names(agents_dir)
+
+    def fail_scandir(path):
+        raise AssertionError("agents directory rescanned without a change")
+    with monkeypatch.context() as patch:
+        patch.setattr(server_app.os, "scandir", fail_scandir)
+        assert server_app._list_agent_names(agents_dir) is first
+
+    (agents_dir / "new-agent.json").write_text("{}")
+    _touch_dir(agents_dir)
+    assert sorted(server_app._list_agent_names(agents_dir)) == ["example", "new-agent", "starter"]
+
+def test_missing_agents_directory_lists_nothing(tmp_path, monkeypatch):
+    monkeypatch.setattr(server_app, "_agents_cache", None)
+    assert server_app._list_agent_names(tmp_path / "missing") == []
@@ -0,0 +1,34 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from src.server.middleware import PathCORSMiddleware
+
+def _client() -> TestClient:
+    app = FastAPI()
+    app.add_middleware(PathCORSMiddleware, paths=["/api/message"], allow_origins=["https://frontend.example"], allow_methods=["*"])
+
+    @app.post("/api/message")
+    async def api_message():
+        return {}
+
+    @app.post("/agent/action")
+    async def agent_action():
+        return {}
+
+    return TestClient(app)
+
+def _preflight(client: TestClient, path: str):
+    return client.options(path, headers={
+        "Origin": "https://frontend.example",
+        "Access-Control-Request-Method": "POST",
+    })
+
+def test_listed_path_gets_cors_headers():
+    response = _preflight(_client(), "/api/message")
+    assert response.status_code == 200
+    assert response.headers["access-control-allow-origin"] == "https://frontend.example"
+
+def test_other_paths_get_no_cors_headers():
+    client = _client()
+    assert "access-control-allow-origin" not in _preflight(client, "/agent/action").headers
+    response = client.post("/agent/action", headers={"Origin": "https://frontend.example"})
+    assert "access-control-allow-origin" not in response.headers
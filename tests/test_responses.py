@@ -0,0 +1,12 @@
+from decimal import Decimal
+import orjson
+from src.server.responses import ORJSONResponse
+
+def test_decimal_result_is_serialized():
+    # get-balance actions return Decimal values from web3.from_wei
+    response = ORJSONResponse({"status": "success", "result": Decimal("1.5")})
+    assert orjson.loads(response.body) == {"status": "success", "result": 1.5}
+
+def test_bytes_and_sets_are_serialized():
+    response = ORJSONResponse({"raw": b"abc", "tags": {"a"}})
+    assert orjson.loads(response.body) == {"raw": "abc", "tags": ["a"]}
@@ -0,0 +1,24 @@
+import asyncio
+from src.server.routing import ORJSONRequest
+
+def _request(body: bytes) -> ORJSONRequest:
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+    scope = {"type": "http", "method": "POST", "headers": [(b"content-type", b"application/json")]}
+    return ORJSONRequest(scope, receive)
+
+def test_json_body_is_parsed():
+    assert asyncio.run(_request(b'{"content": {"type": "venue_search"}}').json()) == {
+        "content": {"type": "venue_search"}
+    }
+
+def test_wide_integer_keeps_precision():
+    # 100 ETH in wei, wider than 64 bits
+    body = b'{"params": {"amount": 100000000000000000000}}'
+    amount = asyncio.run(_request(body).json())["params"]["amount"]
+    assert amount == 10**20
+    assert isinstance(amount, int)
+
+def test_negative_wide_integer_keeps_precision():
+    body = b'{"amount": -9223372036854775809}'
+    assert asyncio.run(_request(body).json())["amount"] == -9223372036854775809